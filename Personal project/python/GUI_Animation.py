@@ -1,16 +1,19 @@
 import sys
 import argparse
-import json,os,re
+import os
+from array import array
 from dataclasses import dataclass,field
-from typing import Dict, Tuple, Optional
 
-from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal, QSignalBlocker, QRect
-from PyQt5.QtGui import QColor, QPainter, QPen, QBrush, QFont
+from PyQt5.QtCore import Qt, QTimer, QSize, QRect, pyqtSignal, pyqtSlot, QSignalBlocker, QObject, QThread
+from PyQt5.QtGui import QColor, QPainter, QPen, QFont, QImage
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QSlider, QFrame, QSpinBox, QMessageBox, QSplitter
+    QPushButton, QLabel, QSlider, QFrame, QSpinBox, QMessageBox, QSplitter, QCheckBox
 )
 
+# headless part (model, event protocol, maze loader) lives in maze_core
+from maze_core import EventPlayer, MazeModel, is_stream_url, load_walls_from_txt
+
 # ---------------------------
 # Visual config (colors)
 # ---------------------------
@@ -30,137 +33,323 @@ class CellColors:
 COL = CellColors()
 
 # ---------------------------
-# Maze model (in-memory only)
+# Frame rasterizer (worker thread)
 # ---------------------------
-class MazeModel:
+def _argb(c: QColor) -> int:
+    return 0xFF000000 | (c.red() << 16) | (c.green() << 8) | c.blue()
+
+
+def _blend(base: QColor, over: QColor) -> int:
+    a = over.alpha() / 255.0
+    return 0xFF000000 | (
+        (int(over.red() * a + base.red() * (1 - a)) << 16)
+        | (int(over.green() * a + base.green() * (1 - a)) << 8)
+        | int(over.blue() * a + base.blue() * (1 - a))
+    )
+
+
+class FrameRenderer:
     """
-    In-memory maze state for GUI rendering.
-    No file I/O here.
+    Keeps one RGB32 pixel per cell and only repaints cells the model marked
+    dirty (plus best-path / current changes), then scales it up to the view.
+    QImage/QPainter on an image are safe outside the GUI thread.
     """
     def __init__(self):
-        self.n = 10
-        self.m = 10
-        self.start = (0, 0)
-        self.end = (9, 9)
-
-        # wall set: {(x, y), ...}
-        self.walls = set()
-
-        # rendering states
-        self.frontier = set()
-        self.visited = set()
-        self.current: Optional[Tuple[int, int]] = None
-
-        self.step = 0
-        self.last_op = "-"
-        self.message = "Ready"
-        
-        self.cur_path = []   # list[(x,y)]
-        self.cur_path_set = set()
-        
-        self.parent = {}            # (x,y) -> (px,py)
-        self.best_path = []         # list[(x,y)]
-        self.best_path_set = set()
-
-    def reset_states(self):
-        # reset rendering/search state
-        self.frontier = set()
-        self.visited = set()
-        self.current = None
-
-        # reset path reconstruction state (clears orange path too)
-        self.parent = {}
-        self.best_path = []
-        self.best_path_set = set()
-
-        # reset DFS live-stack path (if used)
-        self.cur_path = []
-        self.cur_path_set = set()
-
-        self.step = 0
-        self.last_op = "-"
-        self.message = "Reset"
-    def apply_meta(self, n: int, m: int, sx: int, sy: int, ex: int, ey: int):
-        self.n, self.m = n, m
-        self.start = (sx, sy)
-        self.end = (ex, ey)
-        #self.walls.clear()
-        self.reset_states()
-        self.message = f"Meta loaded: {n}x{m}, start={self.start}, end={self.end}"
-
-    def set_wall(self, x: int, y: int, is_wall: bool = True):
-        if is_wall:
-            self.walls.add((x, y))
+        self.pixels = array("I")
+        self.n = self.m = 0
+        self.shown_best = set()
+        self.shown_current = None
+
+        self.c_wall, self.c_empty = _argb(COL.WALL), _argb(COL.EMPTY)
+        self.c_frontier, self.c_visited = _argb(COL.FRONTIER), _argb(COL.VISITED)
+        self.c_current = _argb(COL.CURRENT)
+        self.c_start, self.c_end = _argb(COL.START), _argb(COL.END)
+        # orange best-path overlay, pre-blended over each base color
+        self.c_best = {
+            self.c_empty: _blend(COL.EMPTY, COL.ORANGE),
+            self.c_wall: _blend(COL.WALL, COL.ORANGE),
+            self.c_frontier: _blend(COL.FRONTIER, COL.ORANGE),
+            self.c_visited: _blend(COL.VISITED, COL.ORANGE),
+            self.c_current: _blend(COL.CURRENT, COL.ORANGE),
+        }
+
+    def _color(self, model: MazeModel, pos) -> int:
+        # same priority as the old per-cell paintEvent
+        if pos in model.walls:
+            c = self.c_wall
+        elif pos == model.start:
+            return self.c_start
+        elif pos == model.end:
+            return self.c_end
+        elif model.current == pos:
+            c = self.c_current
+        elif pos in model.frontier:
+            c = self.c_frontier
+        elif pos in model.visited:
+            c = self.c_visited
+        else:
+            c = self.c_empty
+        if pos in model.best_path_set:
+            c = self.c_best[c]
+        return c
+
+    def render(self, model: MazeModel, w: int, h: int) -> QImage:
+        n, m = model.n, model.m
+        if n <= 0 or m <= 0:
+            return QImage()
+
+        px = self.pixels
+        if model.dirty_all or (n, m) != (self.n, self.m):
+            # full repaint: paint each state set in increasing priority instead of
+            # asking _color() for every cell (1M cells on a 1000x1000 maze)
+            self.n, self.m = n, m
+            self.pixels = px = array("I", [self.c_empty]) * (n * m)
+            layers = (
+                (model.visited, self.c_visited),
+                (model.frontier, self.c_frontier),
+                ((model.current,) if model.current else (), self.c_current),
+                ((model.end,), self.c_end),
+                ((model.start,), self.c_start),
+                (model.walls, self.c_wall),
+            )
+            for cells, c in layers:
+                for x, y in cells:
+                    if 0 <= x < n and 0 <= y < m:
+                        px[x * m + y] = c
+            for x, y in model.best_path_set:
+                if 0 <= x < n and 0 <= y < m and (x, y) != model.start and (x, y) != model.end:
+                    k = x * m + y
+                    px[k] = self.c_best[px[k]]
+        else:
+            touched = model.dirty
+            touched |= self.shown_best ^ model.best_path_set
+            touched.add(self.shown_current)
+            touched.add(model.current)
+            for pos in touched:
+                if pos is not None and 0 <= pos[0] < n and 0 <= pos[1] < m:
+                    px[pos[0] * m + pos[1]] = self._color(model, pos)
+
+        model.dirty = set()
+        model.dirty_all = False
+        self.shown_best = set(model.best_path_set)
+        self.shown_current = model.current
+
+        # 1 px per cell, copy() so the image owns its memory
+        img = QImage(px.tobytes(), m, n, 4 * m, QImage.Format_RGB32).copy()
+
+        cell = int(min(w / m, h / n))
+        if cell < 1:
+            # more cells than pixels: just shrink to fit
+            return img.scaled(max(1, w), max(1, h), Qt.KeepAspectRatio, Qt.FastTransformation)
+
+        img = img.scaled(cell * m, cell * n, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        if cell >= 4:
+            # grid lines
+            painter = QPainter(img)
+            painter.setPen(QPen(COL.GRID_LINE, 1))
+            for x in range(n + 1):
+                painter.drawLine(0, x * cell, cell * m, x * cell)
+            for y in range(m + 1):
+                painter.drawLine(y * cell, 0, y * cell, cell * n)
+            painter.end()
+        return img
+
+
+class PaneWorker(QObject):
+    """
+    Lives in a QThread: applies events and rasterizes frames.
+    Every request ends with one frame_ready(seq, image, status).
+    """
+    frame_ready = pyqtSignal(int, QImage, object)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self):
+        super().__init__()
+        self.player = EventPlayer()
+        self.renderer = FrameRenderer()
+        self.view_w = 260
+        self.view_h = 260
+        self.seq = 0
+
+    def _publish(self, ticket: int = 0):
+        model = self.player.model
+        img = self.renderer.render(model, self.view_w, self.view_h)
+        self.seq += 1
+        status = {
+            "ticket": ticket,
+            "n": model.n, "m": model.m,
+            "step": model.step, "op": model.last_op, "message": model.message,
+            "finished": self.player.finished,
+        }
+        self.frame_ready.emit(self.seq, img, status)
+
+    @pyqtSlot(int, int)
+    def advance(self, ticket: int, batch: int):
+        self.player.consume_events(batch=batch)
+        self._publish(ticket)
+
+    @pyqtSlot()
+    def reset(self):
+        self.player.reset()
+        self._publish()
+
+    @pyqtSlot(int, int)
+    def resize(self, w: int, h: int):
+        self.view_w, self.view_h = w, h
+        self._publish()
+
+    @pyqtSlot(str)
+    def load_maze(self, path: str):
+        try:
+            self.player.load_maze_txt(path)
+        except Exception as e:
+            self.failed.emit("Load failed", str(e))
+            return
+        self._publish()
+
+    @pyqtSlot(str)
+    def load_events(self, path: str):
+        try:
+            self.player.load_events_from_jsonl(path)
+        except Exception as e:
+            self.failed.emit("Load failed", str(e))
+            return
+        self._publish()
+
+    @pyqtSlot(str)
+    def attach(self, url: str):
+        # live stream from `python -m maze_core serve`
+        self.player.attach_stream(url)
+        self._publish()
+
+    @pyqtSlot(int, int)
+    def toggle_wall(self, x: int, y: int):
+        model = self.player.model
+        pos = (x, y)
+        # don't allow overwriting start/end
+        if pos == model.start or pos == model.end:
+            return
+
+        if pos in model.walls:
+            model.set_wall(x, y, False)
+            model.message = f"Wall removed at {pos}"
         else:
-            self.walls.discard((x, y))
+            model.set_wall(x, y, True)
+            model.message = f"Wall added at {pos}"
+        self._publish()
+
+
+def diff_overlay_image(diff, only_self, only_ref) -> QImage:
+    """
+    Heat overlay, 1 px per cell (ARGB32): blue = this trace reached the cell
+    first, red = the baseline did, green / purple = only this / only the baseline.
+    """
+    import numpy as np
+
+    n, m = diff.shape
+    out = np.zeros(n * m, dtype=np.uint32)
+    d = diff.reshape(-1)
+    both = ~np.isnan(d)
+    if both.any():
+        scale = max(1.0, float(np.abs(d[both]).max()))
+        alpha = (60 + 160 * np.abs(d[both]) / scale).astype(np.uint32)
+        rgb = np.where(d[both] < 0, np.uint32(0x1E64FF), np.uint32(0xFF3C28))
+        out[both] = (alpha << 24) | rgb
+    out[only_self.reshape(-1)] = 0xAA32CD32
+    out[only_ref.reshape(-1)] = 0xAA9400D3
+    return QImage(out.tobytes(), m, n, 4 * m, QImage.Format_ARGB32).copy()
+
+
+class DiffWorker(QObject):
+    """
+    Scans the traces once (maze_core.compare, needs numpy) off the GUI thread
+    and diffs every pane against the first one. Panes are (index, title, path),
+    results carry the index back (titles need not be unique).
+    """
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str, str)
+
+    @pyqtSlot(object)
+    def run(self, panes: list):
+        try:
+            from maze_core.compare import diff_maps, scan_visits
+            (_, ref_title, ref_path), rest = panes[0], panes[1:]
+            ref = scan_visits(ref_path)
+            results = []
+            for idx, title, path in rest:
+                vm = scan_visits(path)
+                diff, summary = diff_maps(vm, ref)
+                img = diff_overlay_image(diff, vm.seen & ~ref.seen, ref.seen & ~vm.seen)
+                results.append((idx, title, ref_title, img, summary))
+        except ImportError as e:
+            self.failed.emit("Diff unavailable", f"--diff needs numpy: {e}")
+            return
+        except Exception as e:
+            self.failed.emit("Diff failed", str(e))
+            return
+        self.done.emit(results)
 
 
 # ---------------------------
 # Grid widget
 # ---------------------------
 class GridWidget(QWidget):
-    def __init__(self, model: MazeModel, parent=None, editable_walls: bool = False):
+    """
+    Only blits the newest frame from the pane's worker; stale frames are dropped.
+    """
+    resized = pyqtSignal(int, int)
+    cell_clicked = pyqtSignal(int, int)
+
+    def __init__(self, parent=None, editable_walls: bool = False):
         super().__init__(parent)
-        self.model = model
         self.editable_walls = editable_walls
+        self.frame = QImage()
+        self.frame_seq = 0
+        self.n, self.m = 0, 0
+        # optional cross-trace heat map (CompareWindow --diff), drawn over the frame
+        self.overlay = QImage()
+        self.show_overlay = True
         self.setMinimumSize(QSize(260, 260))
         self.setSizePolicy(self.sizePolicy().Expanding, self.sizePolicy().Expanding)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing, False)
-
-        n, m = self.model.n, self.model.m
-        if n <= 0 or m <= 0:
+    def set_frame(self, seq: int, img: QImage, n: int, m: int):
+        if seq <= self.frame_seq:
             return
+        self.frame_seq = seq
+        self.frame = img
+        self.n, self.m = n, m
+        self.update()
 
-        # compute cell size
-        w, h = self.width(), self.height()
-        cell = int(min(w / m, h / n))
-        ox = (w - cell * m) // 2
-        oy = (h - cell * n) // 2
+    def set_overlay(self, img: QImage):
+        self.overlay = img
+        self.update()
+
+    def set_show_overlay(self, on: bool):
+        self.show_overlay = bool(on)
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit(self.width(), self.height())
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
 
         # background
         painter.fillRect(self.rect(), QColor(245, 245, 245))
+        if self.frame.isNull():
+            return
 
-        # draw cells
-        for x in range(n):
-            for y in range(m):
-                rect_x = ox + y * cell
-                rect_y = oy + x * cell
-
-                pos = (x, y)
-                color = COL.EMPTY
-                if pos in self.model.walls:
-                    color = COL.WALL
-                elif pos == self.model.start:
-                    color = COL.START
-                elif pos == self.model.end:
-                    color = COL.END
-                elif self.model.current == pos:
-                    color = COL.CURRENT
-                elif pos in self.model.frontier:
-                    color = COL.FRONTIER
-                elif pos in self.model.visited:
-                    color = COL.VISITED
-
-                painter.fillRect(rect_x, rect_y, cell, cell, QBrush(color))
-
-                # grid line
-                painter.setPen(QPen(COL.GRID_LINE, 1))
-                painter.drawRect(rect_x, rect_y, cell, cell)
-        
-        if self.model.best_path_set:
-            for (x, y) in self.model.best_path_set:
-                if (x, y) == self.model.start or (x, y) == self.model.end:
-                    continue
-                rect = QRect(ox + y*cell, oy + x*cell, cell, cell)
-                painter.fillRect(rect, COL.ORANGE)
+        ox = (self.width() - self.frame.width()) // 2
+        oy = (self.height() - self.frame.height()) // 2
+        painter.drawImage(ox, oy, self.frame)
+        if self.show_overlay and not self.overlay.isNull():
+            painter.drawImage(QRect(ox, oy, self.frame.width(), self.frame.height()), self.overlay)
 
         # draw legend text (simple)
         painter.setPen(QPen(QColor(60, 60, 60)))
         painter.setFont(QFont("Arial", 10))
-        painter.drawText(10, 20, f"Grid: {n}x{m}")
+        painter.drawText(10, 20, f"Grid: {self.n}x{self.m}")
 
     def mousePressEvent(self, event):
         """
@@ -172,9 +361,13 @@ class GridWidget(QWidget):
         if event.button() != Qt.LeftButton:
             return
 
-        n, m = self.model.n, self.model.m
+        n, m = self.n, self.m
+        if n <= 0 or m <= 0:
+            return
         w, h = self.width(), self.height()
         cell = int(min(w / m, h / n))
+        if cell < 1:
+            return
         ox = (w - cell * m) // 2
         oy = (h - cell * n) // 2
 
@@ -186,39 +379,46 @@ class GridWidget(QWidget):
         if not (0 <= x < n and 0 <= y < m):
             return
 
-        pos = (x, y)
-        # don't allow overwriting start/end
-        if pos == self.model.start or pos == self.model.end:
-            return
-
-        if pos in self.model.walls:
-            self.model.set_wall(x, y, False)
-            self.model.message = f"Wall removed at {pos}"
-        else:
-            self.model.set_wall(x, y, True)
-            self.model.message = f"Wall added at {pos}"
-
-        self.update()
-        self.status_changed.emit()
+        self.cell_clicked.emit(x, y)
 
 # ---------------------------
 # Main window: player skeleton
 # ---------------------------
 class PlayerPane(QWidget):
+    # requests to the worker thread (queued connections)
+    _req_advance = pyqtSignal(int, int)
+    _req_reset = pyqtSignal()
+    _req_resize = pyqtSignal(int, int)
+    _req_load_maze = pyqtSignal(str)
+    _req_load_events = pyqtSignal(str)
+    _req_attach = pyqtSignal(str)
+
     def __init__(self, title:str, parent = None, editable_walls = False):
         super().__init__(parent)
         self.title = title
 
-        self.model = MazeModel()
-
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.on_tick)
 
-        self.events = []
-        self.event_idx = 0
+        # event application + rasterization run in their own thread
+        # (not `self.thread`: that would shadow QObject.thread())
+        self.worker_thread = QThread(self)
+        self.worker = PaneWorker()
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.finished.connect(self.worker.deleteLater)
+        # a pane deleted without closeEvent must not destroy a running QThread;
+        # the slot holds the thread, not self (already half destroyed by then)
+        thread = self.worker_thread
+        self.destroyed.connect(lambda *_: (thread.quit(), thread.wait()))
+
+        # at most one advance request in flight, ticks in between are merged
+        self._ticket = 0
+        self._inflight = False
+        self._pending = 0
 
         self._build_ui(editable_walls)
         self._wire_signals()
+        self.worker_thread.start()
 
     def _build_ui(self, editable_walls: bool):
         root = QVBoxLayout(self)
@@ -226,7 +426,7 @@ class PlayerPane(QWidget):
         self.lbl_title = QLabel(self.title)
         root.addWidget(self.lbl_title)
 
-        self.grid = GridWidget(self.model, parent=self, editable_walls=editable_walls)
+        self.grid = GridWidget(parent=self, editable_walls=editable_walls)
         root.addWidget(self.grid, stretch=1)
 
         # Controls panel
@@ -309,302 +509,98 @@ class PlayerPane(QWidget):
 
         self.speed_slider.valueChanged.connect(self.on_speed_change)
 
+        self._req_advance.connect(self.worker.advance)
+        self._req_reset.connect(self.worker.reset)
+        self._req_resize.connect(self.worker.resize)
+        self._req_load_maze.connect(self.worker.load_maze)
+        self._req_load_events.connect(self.worker.load_events)
+        self._req_attach.connect(self.worker.attach)
+        self.grid.resized.connect(self._req_resize)
+        self.grid.cell_clicked.connect(self.worker.toggle_wall)
+        self.worker.frame_ready.connect(self.on_frame)
+        self.worker.failed.connect(lambda title, text: QMessageBox.critical(self, title, text))
+
     # ---------------------------
     # Playback controls
     # ---------------------------
     def play(self):
         interval = self.speed_slider.value()
         self.timer.start(interval)
-        self.model.message = "Playing"
-        self.update_status_labels()
+        self.lbl_msg.setText("Playing")
 
     def pause(self):
         self.timer.stop()
-        self.model.message = "Paused"
-        self.update_status_labels()
+        self.lbl_msg.setText("Paused")
 
     def reset(self):
         self.timer.stop()
-        self.model.reset_states()
-        self.event_idx = 0
-        self.model.message = "Reset (no file loaded)"
-        self.update_status_labels()
-        self.grid.update()
+        self._pending = 0
+        self._req_reset.emit()
 
     def step_once(self):
         self.timer.stop()
-        self.consume_events(batch=self.batch_spin.value())
-        self.grid.update()
-        self.update_status_labels()
+        self.request_advance(self.batch_spin.value())
 
     def on_tick(self):
-        self.consume_events(batch=self.batch_spin.value())
-        self.grid.update()
-        self.update_status_labels()
+        self.request_advance(self.batch_spin.value())
 
     def on_speed_change(self, v: int):
         self.speed_value.setText(str(v))
         if self.timer.isActive():
             self.timer.start(v)
 
-    # ---------------------------
-    # Event handling (core hook)
-    # ---------------------------
-    def consume_events(self, batch: int = 1):
-        """
-        Later: if you load JSONL -> self.events becomes a list[dict].
-        Now: if no events, we just do nothing.
-        """
-        if not self.events:
-            # For skeleton demo, you can optionally generate fake events here.
-            self.model.message = "No events loaded yet"
+    def request_advance(self, batch: int):
+        if self._inflight:
+            # worker still busy with the previous frame: fold this tick into the next request
+            self._pending += batch
             return
-
-        for _ in range(batch):
-            if self.event_idx >= len(self.events):
-                self.timer.stop()
-                self.model.last_op = "EOF"
-                self.model.message = "Reached end of event stream"
-                break
-
-            ev = self.events[self.event_idx]
-            self.event_idx += 1
-            self.apply_event(ev)
-
-    def apply_event(self, ev: Dict):
-        """
-        Event protocol hook.
-        Expected keys based on your design:
-        - op: meta / set_current / visited_add / frontier_add / found / done
-        - t, x, y, dist, (and meta fields: n, m, sx, sy, ex, ey)
-        """
-        op = ev.get("op", "")
-        self.model.last_op = op
-        self.model.step = ev.get("t", self.model.step)
-
-        if op == "meta":
-            self.model.apply_meta(
-                ev.get("n", self.model.n),
-                ev.get("m", self.model.m),
-                ev.get("sx", self.model.start[0]),
-                ev.get("sy", self.model.start[1]),
-                ev.get("ex", self.model.end[0]),
-                ev.get("ey", self.model.end[1]),
-            )
-            
-        if op == "done":
+        self._ticket += 1
+        self._inflight = True
+        self._req_advance.emit(self._ticket, batch + self._pending)
+        self._pending = 0
+
+    def on_frame(self, seq: int, img: QImage, status: dict):
+        self.grid.set_frame(seq, img, status["n"], status["m"])
+        self.update_status_labels(status)
+        if status["finished"]:
             self.timer.stop()
-            self.model.message = "Done"
-            return
-
-        # DFS: explicit best-path stream
-        if op == "best_clear":
-            self.model.best_path = []
-            self.model.best_path_set = set()
-            self.model.message = "Best path cleared"
-            return
-            
-        x = ev.get("x",None)
-        y = ev.get("y",None)
-        if x is None or y is None:
-            return
-            
-        pos = (x, y)
-        px = ev.get("px", None)
-        py = ev.get("py", None)
-        if px is not None and py is not None and px >= 0 and py >= 0:
-            self.model.parent[pos] = (px, py)
-
-        if op == "best_add":
-            # DFS best-path stream
-            self.model.best_path.append(pos)
-            self.model.best_path_set.add(pos)
-            self.model.message = f"Best path add {pos}"
-            return
-            
-        if op in ("frontier_add", "relax"):
-            # A*: relax == (re)insert/update in open-set; show it as frontier
-            self.model.frontier.add(pos)
-            px = ev.get("px"); py = ev.get("py")
-            if px is not None and py is not None and px >= 0 and py >= 0:
-                self.model.parent[pos] = (px, py)
-        
-        elif op == "set_current":
-            self.model.current = (x, y)
-            # popped from frontier
-            self.model.frontier.discard(pos)
-            # BFS/A*: reconstruct best path from parent chain
-            # (DFS uses best_clear/best_add; its parent map is empty.)
-            if self.model.parent:
-                self.rebuild_best_path(pos)
-            self.model.message = f"Current = {(x, y)}"
-                
-        elif op == "path_push":
-            self.model.cur_path.append(pos)
-            self.model.cur_path_set.add(pos)
-
-        elif op == "path_pop":
-            # 理论上 pop 的就是栈顶；保险起见按 pos 移除也行
-            if self.model.cur_path and self.model.cur_path[-1] == pos:
-                self.model.cur_path.pop()
-                self.model.cur_path_set.discard(pos)
-            else:
-                # fallback：乱序也能删
-                if pos in self.model.cur_path_set:
-                    self.model.cur_path_set.remove(pos)
-                    self.model.cur_path = [p for p in self.model.cur_path if p != pos]
-
-        elif op == "best_add":
-            # DFS best path cell
-            self.model.best_path.append(pos)
-            self.model.best_path_set.add(pos)
-            self.model.message = f"Best add {pos}"
-        
-
-        elif op == "visited_add":
-            self.model.visited.add((x, y))
-            self.model.frontier.discard((x, y))
-            self.model.message = f"Visited add {(x, y)}"
-
-        elif op == "frontier_add":
-            self.model.frontier.add((x, y))
-            self.model.message = f"Frontier add {(x, y)}"
-                
-        elif op in ("wall", "set_wall"):
-            is_wall = ev.get("is_wall", True)
-            if is_wall:
-                self.model.walls.add((x, y))
-            else:
-                self.model.walls.discard((x, y))
-            self.model.message = f"Wall {'add' if is_wall else 'remove'} {(x, y)}"
-
-        elif op == "walls":
-            # 支持一次性传一堆墙： {"op":"walls","cells":[[x,y],...]}
-            cells = ev.get("cells", [])
-            cnt = 0
-            for c in cells:
-                if isinstance(c, (list, tuple)) and len(c) >= 2:
-                    self.model.walls.add((int(c[0]), int(c[1])))
-                    cnt += 1
-                elif isinstance(c, dict) and "x" in c and "y" in c:
-                    self.model.walls.add((int(c["x"]), int(c["y"])))
-                    cnt += 1
-            self.model.message = f"Walls loaded: {cnt}"
-
-        elif op in ("frontier_remove", "frontier_pop"):
-            self.model.frontier.discard((x, y))
-            self.model.message = f"Frontier remove {(x, y)}"
-
-        elif op == "path":
-            # 最终路径： {"op":"path","cells":[[x,y],...]}
-            # 这里先把 path 画成 visited（简单 MVP）。你也可以单独加一个 self.model.path 来上色。
-            cells = ev.get("cells", [])
-            for c in cells:
-                if isinstance(c, (list, tuple)) and len(c) >= 2:
-                    self.model.visited.add((int(c[0]), int(c[1])))
-            self.model.message = f"Path cells: {len(cells)}"
-
-        elif op == "found":
-            self.model.current = (x, y) if x is not None and y is not None else self.model.current
-            # Ensure final shortest path is shown for BFS/A*
-            if self.model.parent:
-                self.rebuild_best_path(pos)
-            self.model.message = "Found end!"
-
-            
-        
-
-    def update_status_labels(self):
-        self.lbl_step.setText(f"step: {self.model.step}")
-        self.lbl_op.setText(f"op: {self.model.last_op}")
-        self.lbl_msg.setText(self.model.message)
-        
-    def rebuild_best_path(self, end_pos):
-        start = self.model.start
-        parent = self.model.parent
-
-        path = []
-        cur = end_pos
-        seen = set()  # 防止 parent 链出环导致死循环
-
-        while cur is not None and cur not in seen:
-            seen.add(cur)
-            path.append(cur)
-            if cur == start:
-                break
-            cur = parent.get(cur, None)
-
-        if not path or path[-1] != start:
-            # 说明 parent 链还不完整（比如 current 还没被 parent 记录）
-            self.model.best_path = []
-            self.model.best_path_set = set()
-            return
-
-        path.reverse()
-        self.model.best_path = path
-        self.model.best_path_set = set(path)
+            self._pending = 0
+        if status["ticket"] == self._ticket and self._inflight:
+            self._inflight = False
+            if self._pending:
+                self.request_advance(0)
 
+    def update_status_labels(self, status: dict):
+        self.lbl_step.setText(f"step: {status['step']}")
+        self.lbl_op.setText(f"op: {status['op']}")
+        self.lbl_msg.setText(status["message"])
 
     # ---------------------------
-    # Later: loading API (placeholder)
+    # Loading API (handled by the worker)
     # ---------------------------
-    
-    def load_maze_txt(self, maze_path: str):
-        n, m, walls, s, e = self.load_walls_from_txt(maze_path)
 
-        self.model.walls = walls
+    def load_maze_txt(self, maze_path: str):
+        self._req_load_maze.emit(maze_path)
 
-        # 如果 txt 里有 4/3，就用它覆盖（这样绿/红格就和 txt 一致）
-        if s is not None:
-            self.model.start = s
-        if e is not None:
-            self.model.end = e
-    
     def load_events_from_jsonl(self, path: str):
         if not path:
             QMessageBox.warning(self, "No file", "Empty --events path.")
             return
 
-        if not os.path.exists(path):
-            QMessageBox.critical(self, "Not found", f"File does not exist:\n{path}")
+        if is_stream_url(path):
+            self.timer.stop()
+            self._pending = 0
+            self._req_attach.emit(path)
             return
 
-        events = []
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                for ln, line in enumerate(f, start=1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        events.append(json.loads(line))
-                    except json.JSONDecodeError as e:
-                        raise ValueError(f"JSON decode error at line {ln}: {e}\nLine={line[:200]}") from e
-        except Exception as e:
-            QMessageBox.critical(self, "Load failed", str(e))
+        if not os.path.exists(path):
+            QMessageBox.critical(self, "Not found", f"File does not exist:\n{path}")
             return
 
         self.timer.stop()
-        self.events = events
-        self.event_idx = 0
-
-        # 清空当前状态
-        self.model.reset_states()
-        #self.model.walls.clear()
-
-        # 预处理：把 meta + 墙体类事件先应用掉，这样一加载就能看到正确迷宫
-        while self.event_idx < len(self.events):
-            op = self.events[self.event_idx].get("op", "")
-            if op in ("meta", "wall", "set_wall", "walls"):
-                self.apply_event(self.events[self.event_idx])
-                self.event_idx += 1
-                continue
-            break
-
-        self.model.message = f"Loaded {len(self.events)} events from {path}"
-        self.update_status_labels()
-        self.grid.update()
-        
+        self._pending = 0
+        self._req_load_events.emit(path)
+
     def set_speed_ms(self, ms: int):
         ms = max(1, int(ms))
         # 如果你保留了 speed_slider，就同步 UI；如果之后要隐藏本地控件，也没问题
@@ -612,54 +608,28 @@ class PlayerPane(QWidget):
             with QSignalBlocker(self.speed_slider):
                 self.speed_slider.setValue(ms)
         self.timer.setInterval(ms)
-        self.update_status_labels()
 
     def set_batch(self, k: int):
         k = max(1, int(k))
         if hasattr(self, "batch_spin"):
             with QSignalBlocker(self.batch_spin):
                 self.batch_spin.setValue(k)
-        self.update_status_labels()
-
-    @staticmethod
-    def load_walls_from_txt(path: str):
-        with open(path, "r", encoding="utf-8") as f:
-            raw_lines = [ln.strip() for ln in f if ln.strip()]
-
-        if not raw_lines:
-            raise ValueError(f"Empty maze file: {path}")
-
-        # 读第一行 n m
-        header = [int(x) for x in re.findall(r"-?\d+", raw_lines[0])]
-        if len(header) < 2:
-            raise ValueError(f"First line must contain n m, got: {raw_lines[0]!r}")
-        n, m = header[0], header[1]
-
-        if len(raw_lines) < 1 + n:
-            raise ValueError(f"Expected {n} rows after header, but got {len(raw_lines)-1}")
 
-        walls = set()
-        start = None
-        end = None
-
-        for x in range(n):
-            nums = [int(x) for x in re.findall(r"-?\d+", raw_lines[1 + x])]
-            if len(nums) != m:
-                raise ValueError(f"Row {x} length {len(nums)} != {m}. Line={raw_lines[1+x]!r}")
+    def shutdown(self):
+        self.timer.stop()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
 
-            for y, v in enumerate(nums):
-                if v == 1:
-                    walls.add((x, y))
-                elif v == 4:
-                    start = (x, y)
-                elif v == 3:
-                    end = (x, y)
-                # 0 以及其他值默认当空地
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
 
-        return n, m, walls, start, end
+    load_walls_from_txt = staticmethod(load_walls_from_txt)
 
 class CompareWindow(QMainWindow):
-    def __init__(self, panes: list[tuple[str, str]], maze_path: str = ""):
+    _req_diff = pyqtSignal(object)
+
+    def __init__(self, panes: list[tuple[str, str]], maze_path: str = "", diff: bool = False):
         super().__init__()
         self.setWindowTitle("PP Maze Visualizer - Compare Mode")
 
@@ -696,6 +666,13 @@ class CompareWindow(QMainWindow):
         batch.setValue(1)
         ctrl_layout.addWidget(batch)
 
+        # --diff: heat map of first-visit time vs the first pane
+        self.chk_diff = QCheckBox("Diff overlay")
+        self.chk_diff.setChecked(True)
+        self.chk_diff.setVisible(diff)
+        ctrl_layout.addSpacing(20)
+        ctrl_layout.addWidget(self.chk_diff)
+
         root.addWidget(ctrl, stretch=0)      # 放在 splitter 上面
         
         self.splitter = QSplitter(Qt.Horizontal)
@@ -708,6 +685,7 @@ class CompareWindow(QMainWindow):
 
         speed.valueChanged.connect(lambda v: self._foreach_pane(lambda p: p.set_speed_ms(v)))
         batch.valueChanged.connect(lambda v: self._foreach_pane(lambda p: p.set_batch(v)))
+        self.chk_diff.toggled.connect(lambda on: self._foreach_pane(lambda p: p.grid.set_show_overlay(on)))
 
 
         self.setCentralWidget(central)
@@ -719,6 +697,32 @@ class CompareWindow(QMainWindow):
         for title, events_path in panes:
             self.add_pane(title, events_path)
 
+        self.diff_thread = None
+        traced = [(i, t, p) for i, (t, p) in enumerate(panes) if p and not is_stream_url(p)]
+        if diff and len(traced) >= 2:
+            self.start_diff(traced)
+
+    def start_diff(self, panes: list[tuple[int, str, str]]):
+        self.diff_thread = QThread(self)
+        self.diff_worker = DiffWorker()
+        self.diff_worker.moveToThread(self.diff_thread)
+        self.diff_thread.finished.connect(self.diff_worker.deleteLater)
+        self.diff_worker.done.connect(self.on_diff)
+        self.diff_worker.failed.connect(lambda title, text: QMessageBox.warning(self, title, text))
+        self._req_diff.connect(self.diff_worker.run)
+        self.diff_thread.start()
+        self._req_diff.emit(panes)
+
+    def on_diff(self, results: list):
+        for idx, title, ref_title, img, s in results:
+            pane = self.panes[idx]
+            pane.grid.set_overlay(img)
+            pane.grid.set_show_overlay(self.chk_diff.isChecked())
+            pane.lbl_title.setText(
+                f"{title} vs {ref_title}: only {title} {s['only_a']}, only {ref_title} {s['only_b']}, "
+                f"{title} first on {s['a_first']}/{s['both']} shared cells"
+            )
+
     def add_pane(self, title: str, events_path: str):
         pane = PlayerPane(title=title, editable_walls=False)
 
@@ -735,6 +739,14 @@ class CompareWindow(QMainWindow):
         for p in self.panes:
             fn(p)
 
+    def closeEvent(self, event):
+        # stop worker threads before the panes go away
+        self._foreach_pane(lambda p: p.shutdown())
+        if self.diff_thread is not None:
+            self.diff_thread.quit()
+            self.diff_thread.wait()
+        super().closeEvent(event)
+
 
 
 def main():
@@ -742,7 +754,8 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--events", type=str, default="")
     parser.add_argument("--maze", type=str, default="")
-    parser.add_argument("--pane",action="append",default=[],help='repeatable: "Title:path/to/events.jsonl"')
+    parser.add_argument("--pane",action="append",default=[],help='repeatable: "Title:path/to/events.jsonl" (or "Title:tcp://127.0.0.1:8765" for a maze_core serve stream)')
+    parser.add_argument("--diff",action="store_true",help="heat overlay of first-visit time vs the first --pane (needs numpy)")
     args = parser.parse_args()
     
     print("Events path =", args.events)
@@ -762,7 +775,7 @@ def main():
         w = CompareWindow(panes=panes or [("Single", args.events if hasattr(args, "events") else "")],
                           maze_path=args.maze)
     else:
-        w = CompareWindow(panes=panes, maze_path=args.maze)
+        w = CompareWindow(panes=panes, maze_path=args.maze, diff=args.diff)
 
     w.show()
     sys.exit(app.exec_())
@@ -0,0 +1,137 @@
+"""
+Group a per-cell BFS trace into layer-batched events.
+
+  frontier_add (dist d)   -> one {"op":"frontier_batch","dist":d,"cells":[...],"parents":[...]}
+  set_current/visited_add -> one {"op":"visited_batch","dist":d,"cells":[...]}
+
+Layer d's visited_batch is followed by layer d+1's frontier_batch, which is
+what the per-cell stream looks like once layer d is fully processed. Every
+other op (meta, walls, found, best_*, done, ...) is passed through in place,
+`t` is renumbered.
+
+Only single-source layered BFS traces can be grouped (cpp/BFS.cpp,
+trace_gen.py bfs): one dist 0 root, every frontier_add one layer below the
+cell being expanded, and cells expanded in the order they were added. Any
+trace breaking that (A*, JPS, DFS, bibfs, ...) is rejected.
+
+Usage:
+  python batch_trace.py ../out/bfs_events.jsonl ../out/bfs_batched.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from typing import Dict, List, Optional
+
+from maze_core import iter_events
+
+
+class LayerBatcher:
+    def __init__(self, out):
+        self.out = out
+        self.tick = 0
+        self.layer: Optional[int] = None      # dist of the visited layer being collected
+        self.visited: List[List[int]] = []
+        self.frontier: Dict[int, List[List[int]]] = {}
+        self.parents: Dict[int, List[List[int]]] = {}
+        self.queued = deque()                 # (x, y, dist) in frontier_add order
+        self.rooted = False
+
+    def _write(self, ev: dict):
+        self.tick += 1
+        rec = {"t": self.tick}
+        rec.update((k, v) for k, v in ev.items() if k != "t")
+        self.out.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+    def _flush_visited(self):
+        if self.visited:
+            self._write({"op": "visited_batch", "dist": self.layer, "cells": self.visited})
+            self.visited = []
+
+    def _flush_frontier(self, upto: Optional[int] = None):
+        for d in sorted(self.frontier):
+            if upto is not None and d > upto:
+                break
+            self._write({"op": "frontier_batch", "dist": d,
+                         "cells": self.frontier.pop(d), "parents": self.parents.pop(d)})
+
+    def feed(self, ev: dict, idx: int = 0):
+        op = ev.get("op", "")
+        if op == "frontier_add":
+            d = ev.get("dist", 0)
+            if self.rooted and self.layer is None:
+                raise ValueError(f"event {idx}: second frontier_add before any expansion, not a single-source BFS trace")
+            want = self.layer + 1 if self.rooted else 0
+            if d != want:
+                raise ValueError(f"event {idx}: frontier_add dist {d}, expected {want}, not a single-source layered BFS trace")
+            self.rooted = True
+            self.queued.append((ev["x"], ev["y"], d))
+            self.frontier.setdefault(d, []).append([ev["x"], ev["y"]])
+            self.parents.setdefault(d, []).append([ev.get("px", -1), ev.get("py", -1)])
+        elif op == "set_current":
+            # implied by visited_batch
+            return
+        elif op == "visited_add":
+            d = ev.get("dist", 0)
+            head = self.queued.popleft() if self.queued else None
+            if head != (ev["x"], ev["y"], d):
+                raise ValueError(f"event {idx}: visited ({ev['x']},{ev['y']}) dist {d}, "
+                                 f"expected {head} (FIFO order), not a layered BFS trace")
+            if d != self.layer:
+                self._flush_visited()
+                self._flush_frontier(upto=d)
+                self.layer = d
+            self.visited.append([ev["x"], ev["y"]])
+        elif op in ("relax", "path_push", "path_pop", "frontier_remove", "frontier_pop"):
+            raise ValueError(f"event {idx}: op {op!r} is not a BFS op, cannot batch this trace")
+        else:
+            self._flush_visited()
+            self._flush_frontier()
+            self._write(ev)
+
+    def close(self):
+        self._flush_visited()
+        self._flush_frontier()
+
+
+def batch_trace(src: str, dst: str):
+    """
+    Convert src -> dst, returns (events in, events out). dst is only
+    replaced once the whole trace converted, a rejected trace leaves it as it was.
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise ValueError("src and dst are the same file")
+    tmp = f"{dst}.tmp{os.getpid()}"
+    n_in = 0
+    try:
+        with open(tmp, "w", encoding="utf-8") as fout:
+            b = LayerBatcher(fout)
+            for ev in iter_events(src):
+                n_in += 1
+                b.feed(ev, n_in)
+            b.close()
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return n_in, b.tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group a BFS event trace into per-layer batch events")
+    parser.add_argument("src", type=str)
+    parser.add_argument("dst", type=str)
+    args = parser.parse_args()
+
+    try:
+        n_in, n_out = batch_trace(args.src, args.dst)
+    except ValueError as e:
+        print(f"{args.src}: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.src}: {n_in} events -> {n_out} events ({args.dst})")
+
+
+if __name__ == "__main__":
+    main()
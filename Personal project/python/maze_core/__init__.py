@@ -0,0 +1,39 @@
+"""
+Headless core of the maze visualizer: model, event protocol, maze loader.
+
+No Qt import anywhere in here, and submodules are only imported on first
+attribute access, so scripts / benchmarks start without the GUI stack:
+
+    from maze_core import EventPlayer
+    p = EventPlayer()
+    p.load_events_from_jsonl("out/bfs_events.jsonl")
+    p.consume_events(10**9)
+"""
+import importlib
+
+# public name -> submodule
+_EXPORTS = {
+    "MazeModel": "model",
+    "EventPlayer": "protocol",
+    "iter_events": "protocol",
+    "is_stream_url": "protocol",
+    "load_walls_from_txt": "maze_io",
+    # needs numpy
+    "scan_visits": "compare",
+    "diff_maps": "compare",
+    "compare_traces": "compare",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,121 @@
+"""
+Headless commands (no Qt):
+
+  python -m maze_core replay ../out/bfs_events.jsonl --maze ../data/ScannedMaze.txt
+  python -m maze_core compare ../out/bfs_events.jsonl ../out/astar_events.jsonl ../out/dfs_events.jsonl
+  python -m maze_core serve ../out/dfs_events.jsonl --maze ../data/ScannedMaze.txt --rate 2000
+  python -m maze_core watch tcp://127.0.0.1:8765
+"""
+import argparse
+import time
+
+from . import EventPlayer
+
+
+def cmd_replay(args):
+    t0 = time.perf_counter()
+    p = EventPlayer()
+    if args.maze:
+        p.load_maze_txt(args.maze)
+    p.load_events_from_jsonl(args.events)
+    t1 = time.perf_counter()
+    while not p.finished:
+        p.consume_events(args.batch)
+    t2 = time.perf_counter()
+
+    m = p.model
+    print(f"{args.events}: {len(p.events)} events, {m.n}x{m.m}")
+    print(f"  visited={len(m.visited)} frontier={len(m.frontier)} best_path={len(m.best_path)}")
+    print(f"  last op={m.last_op} message={m.message!r}")
+    print(f"  load {t1 - t0:.3f}s, apply {t2 - t1:.3f}s")
+
+
+def cmd_compare(args):
+    from .compare import compare_traces
+
+    if len(args.events) < 2:
+        raise SystemExit("compare needs at least two traces")
+    t0 = time.perf_counter()
+    results = compare_traces(args.events)
+    base = args.events[0]
+    for r in results:
+        s = r["summary"]
+        print(f"{r['path']} vs {base}:")
+        print(f"  cells {s['cells_a']} vs {s['cells_b']} (visit events {s['visits_a']} vs {s['visits_b']})")
+        print(f"  shared {s['both']}, only this {s['only_a']}, only baseline {s['only_b']}")
+        print(f"  reached first on {s['a_first']}, later on {s['b_first']}, "
+              f"mean first-visit diff {s['mean_diff']:+.1f}")
+    print(f"  ({time.perf_counter() - t0:.3f}s)")
+
+
+def cmd_serve(args):
+    import asyncio
+    from .broadcast import serve
+
+    try:
+        asyncio.run(serve(args.events, host=args.host, port=args.port, unix=args.unix, maze=args.maze,
+                          follow=args.follow, rate=args.rate, queue_size=args.queue,
+                          resync_interval=args.resync_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_watch(args):
+    from .broadcast import iter_remote_events
+
+    p = EventPlayer()
+    t0 = last = time.perf_counter()
+    keyframes = 0
+    for ev in iter_remote_events(args.url):
+        p.apply_event(ev)
+        keyframes += ev.get("op") == "keyframe"
+        now = time.perf_counter()
+        if now - last >= args.every:
+            last = now
+            m = p.model
+            print(f"t={m.step} visited={len(m.visited)} frontier={len(m.frontier)} op={m.last_op}", flush=True)
+
+    m = p.model
+    print(f"{args.url}: stream closed after {time.perf_counter() - t0:.1f}s, keyframes={keyframes}")
+    print(f"  t={m.step} visited={len(m.visited)} frontier={len(m.frontier)} best_path={len(m.best_path)}")
+    print(f"  message={m.message!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m maze_core")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rp = sub.add_parser("replay", help="apply a whole trace and print the final state")
+    rp.add_argument("events", type=str)
+    rp.add_argument("--maze", type=str, default="")
+    rp.add_argument("--batch", type=int, default=4096)
+    rp.set_defaults(fn=cmd_replay)
+
+    cp = sub.add_parser("compare", help="first-visit difference of each trace vs the first one (needs numpy)")
+    cp.add_argument("events", type=str, nargs="+")
+    cp.set_defaults(fn=cmd_compare)
+
+    sp = sub.add_parser("serve", help="broadcast a trace to any number of viewers")
+    sp.add_argument("events", type=str, help='trace file, "-" = stdin')
+    sp.add_argument("--maze", type=str, default="", help="walls/start/end for the keyframes")
+    sp.add_argument("--follow", action="store_true", help="keep reading a growing file until `done`")
+    sp.add_argument("--rate", type=float, default=0.0, help="events per second, 0 = unpaced")
+    sp.add_argument("--host", type=str, default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8765)
+    sp.add_argument("--unix", type=str, default="", help="unix socket path instead of tcp")
+    sp.add_argument("--queue", type=int, default=4096, help="per-client backlog before a keyframe resync")
+    sp.add_argument("--resync-interval", type=float, default=1.0,
+                    help="minimum seconds between keyframe snapshots, shared by all clients")
+    sp.set_defaults(fn=cmd_serve)
+
+    wp = sub.add_parser("watch", help="attach to a broadcast server and print progress")
+    wp.add_argument("url", type=str, help='"tcp://127.0.0.1:8765" or "unix:/path"')
+    wp.add_argument("--every", type=float, default=1.0, help="seconds between progress lines")
+    wp.set_defaults(fn=cmd_watch)
+
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+Local trace broadcast: one process reads (and parses) a recorded or live
+event stream, any number of viewers / analysis clients attach to it.
+
+  python -m maze_core serve ../out/dfs_events.jsonl --maze ../data/ScannedMaze.txt --rate 2000
+  python -m maze_core serve live.jsonl --follow --unix /tmp/maze.sock
+  python GUI_Animation.py --maze ../data/ScannedMaze.txt --pane "Live:tcp://127.0.0.1:8765"
+  python -m maze_core watch tcp://127.0.0.1:8765
+
+Wire format is the same JSONL protocol as the trace files. A client first
+gets a keyframe (current state rebuilt as batch ops, see encode_keyframe),
+then the raw lines of the tail. Each client has a bounded queue; when it
+overflows, the producer drops that client's queue instead of waiting, and
+the client is resynced with the next keyframe. Slow clients get coarser
+updates, the producer never blocks on them.
+
+Keyframes are encoded in an executor from a snapshot of the state; the
+server takes at most one snapshot per `resync_interval` and shares it with
+every client waiting for a resync at that moment, so the cost does not grow
+with the number of viewers.
+"""
+import asyncio
+import json
+import socket
+import sys
+from typing import Dict, Iterator, Optional
+
+from .maze_io import load_walls_from_txt
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+def _connect(url: str) -> socket.socket:
+    if url.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(url[len("unix:"):])
+        return sock
+    host, _, port = url[len("tcp://"):].rpartition(":")
+    return socket.create_connection((host or DEFAULT_HOST, int(port)))
+
+
+def iter_remote_events(url: str) -> Iterator[Dict]:
+    """Blocking client: yield events from a broadcast server until it closes."""
+    with _connect(url) as sock, sock.makefile("rb") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class TraceState:
+    """
+    The part of EventPlayer's state a keyframe needs, kept up to date per
+    event without the viewer work (EventPlayer.apply_event rebuilds the best
+    path on every set_current). Each op is handled like EventPlayer does;
+    best_path is only derived when a keyframe is built.
+    """
+    def __init__(self):
+        self.n = 10
+        self.m = 10
+        self.start = (0, 0)
+        self.end = (9, 9)
+        self.walls = set()
+        self.reset()
+
+    def reset(self):
+        self.frontier = set()
+        self.visited = set()
+        self.current = None
+        self.parent = {}
+        self.cur_path = []
+        # best path = parent chain of best_anchor (last set_current / found /
+        # visited_batch), then the explicit best_add cells after it
+        self.best_anchor = None
+        self.best_extra = []
+        self.step = 0
+
+    def load_maze_txt(self, maze_path: str):
+        n, m, walls, s, e = load_walls_from_txt(maze_path)
+        self.walls = walls
+        if s is not None:
+            self.start = s
+        if e is not None:
+            self.end = e
+
+    def snapshot(self) -> "TraceState":
+        """Copy that the producer can keep mutating behind (keyframes are encoded off-loop)."""
+        snap = TraceState.__new__(TraceState)
+        snap.__dict__.update(self.__dict__)
+        for k in ("walls", "frontier", "visited", "parent", "cur_path", "best_extra"):
+            setattr(snap, k, getattr(self, k).copy())
+        return snap
+
+    def _anchor(self, pos):
+        if self.parent:
+            self.best_anchor = pos
+            self.best_extra = []
+
+    def apply(self, ev: Dict):
+        op = ev.get("op", "")
+        self.step = ev.get("t", self.step)
+
+        if op == "meta":
+            self.n, self.m = ev.get("n", self.n), ev.get("m", self.m)
+            self.start = (ev.get("sx", self.start[0]), ev.get("sy", self.start[1]))
+            self.end = (ev.get("ex", self.end[0]), ev.get("ey", self.end[1]))
+            self.reset()
+            return
+        if op == "best_clear":
+            self.best_anchor = None
+            self.best_extra = []
+            return
+        if op in ("frontier_batch", "visited_batch"):
+            cells = [(int(c[0]), int(c[1])) for c in ev.get("cells", [])]
+            for pos, par in zip(cells, ev.get("parents", [])):
+                if par[0] >= 0 and par[1] >= 0:
+                    self.parent[pos] = (int(par[0]), int(par[1]))
+            if op == "frontier_batch":
+                self.frontier.update(cells)
+            else:
+                self.visited.update(cells)
+                self.frontier.difference_update(cells)
+                if cells:
+                    self.current = cells[-1]
+                    self._anchor(cells[-1])
+            return
+        if op in ("walls", "path"):
+            target = self.walls if op == "walls" else self.visited
+            for c in ev.get("cells", []):
+                if isinstance(c, (list, tuple)) and len(c) >= 2:
+                    target.add((int(c[0]), int(c[1])))
+                elif op == "walls" and isinstance(c, dict) and "x" in c and "y" in c:
+                    target.add((int(c["x"]), int(c["y"])))
+            return
+
+        x, y = ev.get("x"), ev.get("y")
+        if x is None or y is None:
+            return
+        pos = (x, y)
+        px, py = ev.get("px"), ev.get("py")
+        if px is not None and py is not None and px >= 0 and py >= 0:
+            self.parent[pos] = (px, py)
+
+        if op == "best_add":
+            self.best_extra.append(pos)
+        elif op in ("frontier_add", "relax"):
+            self.frontier.add(pos)
+        elif op == "set_current":
+            self.current = pos
+            self.frontier.discard(pos)
+            self._anchor(pos)
+        elif op == "path_push":
+            self.cur_path.append(pos)
+        elif op == "path_pop":
+            if self.cur_path and self.cur_path[-1] == pos:
+                self.cur_path.pop()
+            else:
+                self.cur_path = [p for p in self.cur_path if p != pos]
+        elif op == "visited_add":
+            self.visited.add(pos)
+            self.frontier.discard(pos)
+        elif op in ("wall", "set_wall"):
+            if ev.get("is_wall", True):
+                self.walls.add(pos)
+            else:
+                self.walls.discard(pos)
+        elif op in ("frontier_remove", "frontier_pop"):
+            self.frontier.discard(pos)
+        elif op == "found":
+            self.current = pos
+            self._anchor(pos)
+
+    def best_path(self) -> list:
+        # same walk as EventPlayer.rebuild_best_path, once per keyframe
+        path = []
+        if self.best_anchor is not None:
+            cur, seen = self.best_anchor, set()
+            while cur is not None and cur not in seen:
+                seen.add(cur)
+                path.append(cur)
+                if cur == self.start:
+                    break
+                cur = self.parent.get(cur)
+            if path[-1] != self.start:
+                path = []
+            path.reverse()
+        return path + self.best_extra
+
+
+def _cells_json(cells) -> str:
+    return ",".join(["[%d,%d]" % c for c in cells])
+
+
+def encode_keyframe(state: TraceState, done: Optional[Dict] = None) -> bytes:
+    """
+    JSONL that rebuilds `state` from scratch on a fresh EventPlayer (meta
+    resets the search state, so it also works as a resync). The cell lists
+    are formatted directly: json.dumps of a million [x, y] lists takes seconds.
+    """
+    t = state.step
+    get_parent = state.parent.get
+
+    def line(ev: Dict) -> str:
+        return json.dumps(ev, separators=(",", ":"))
+
+    def batch(op: str, cells) -> str:
+        cells = list(cells)
+        parents = _cells_json(get_parent(c, (-1, -1)) for c in cells)
+        return f'{{"t":{t},"op":"{op}","cells":[{_cells_json(cells)}],"parents":[{parents}]}}'
+
+    out = [
+        line({"t": t, "op": "keyframe"}),
+        line({"t": t, "op": "meta", "n": state.n, "m": state.m,
+              "sx": state.start[0], "sy": state.start[1], "ex": state.end[0], "ey": state.end[1]}),
+    ]
+    if state.walls:
+        out.append(f'{{"t":{t},"op":"walls","cells":[{_cells_json(state.walls)}]}}')
+    if state.visited:
+        out.append(batch("visited_batch", state.visited))
+    if state.current is not None:
+        # the current cell may sit in neither set (popped, not yet visited_add);
+        # before frontier_batch, set_current drops its cell from the frontier
+        px, py = get_parent(state.current, (-1, -1))
+        out.append(line({"t": t, "op": "set_current", "x": state.current[0], "y": state.current[1],
+                         "px": px, "py": py}))
+    if state.frontier:
+        out.append(batch("frontier_batch", state.frontier))
+    for x, y in state.cur_path:
+        out.append(line({"t": t, "op": "path_push", "x": x, "y": y}))
+    out.append(line({"t": t, "op": "best_clear"}))
+    for x, y in state.best_path():
+        out.append(line({"t": t, "op": "best_add", "x": x, "y": y}))
+    if done is not None:
+        out.append(line(done))
+    out.append("")
+    return "\n".join(out).encode()
+
+
+class _Client:
+    """
+    queue items: raw lines (bytes), a keyframe (Future of bytes, always the
+    first item after a resync) and None (end of stream).
+    """
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.resync = True      # waiting for the next keyframe, the producer skips it
+        self.dropped = 0        # how many times this client fell behind
+
+    def clear(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class TraceBroadcaster:
+    """
+    Applies every event once to a TraceState (the keyframe state) and fans
+    the raw line out to the attached clients.
+
+    Keyframes are scheduled for the whole server, not per client: at most
+    one snapshot + encoding every `resync_interval` seconds, taken at one
+    producer step and handed to every client waiting for a resync.
+    """
+    def __init__(self, queue_size: int = 4096, resync_interval: float = 1.0):
+        self.state = TraceState()
+        self.queue_size = queue_size
+        self.resync_interval = resync_interval
+        self.clients = set()
+        self.finished = False
+        self.done_event: Optional[Dict] = None
+        self.n_events = 0
+        self.bad_lines = 0
+        self.keyframes = 0      # snapshots encoded so far
+        self._want_keyframe = asyncio.Event()
+        self._keyframe_task: Optional[asyncio.Task] = None
+
+    # ---------------------------
+    # producer side
+    # ---------------------------
+    def feed(self, line: bytes):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            ev = json.loads(line)
+            if not isinstance(ev, dict):
+                raise ValueError("not a JSON object")
+        except ValueError as e:
+            # e.g. the last line of a solver killed mid-write: skip it, keep serving
+            self.bad_lines += 1
+            print(f"Skipping bad line after event {self.n_events}: {e} ({line[:80]!r})",
+                  file=sys.stderr, flush=True)
+            return
+        self.state.apply(ev)
+        self.n_events += 1
+        if ev.get("op") == "done":
+            self.done_event = ev
+
+        line += b"\n"
+        for c in self.clients:
+            if c.resync:
+                continue        # the keyframe it is waiting for will contain this event
+            try:
+                c.queue.put_nowait(line)
+            except asyncio.QueueFull:
+                # never wait for a slow client: drop its backlog, resync later
+                self._drop_backlog(c)
+
+    def _drop_backlog(self, c: _Client):
+        c.clear()
+        c.resync = True
+        c.dropped += 1
+        self._want_keyframe.set()
+
+    def finish(self):
+        self.finished = True
+        for c in self.clients:
+            if c.resync:
+                continue        # gets None right after its keyframe
+            try:
+                c.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                self._drop_backlog(c)
+
+    async def pump(self, path: str, follow: bool = False, rate: float = 0.0):
+        """
+        Read a trace ("-" = stdin). follow: keep polling at EOF until a `done`
+        event (a solver still writing the file). rate: events/s, 0 = as fast as possible.
+        """
+        loop = asyncio.get_running_loop()
+        f = sys.stdin.buffer if path == "-" else open(path, "rb")
+        step = max(1, int(rate / 50)) if rate > 0 else 0
+        tail = b""
+        try:
+            while True:
+                block = await loop.run_in_executor(None, f.read1, 1 << 16)
+                if not block:
+                    if follow and path != "-":
+                        await asyncio.sleep(0.1)
+                        continue
+                    break
+                lines = (tail + block).split(b"\n")
+                tail = lines.pop()
+                for i, line in enumerate(lines, start=1):
+                    self.feed(line)
+                    if step and i % step == 0:
+                        await asyncio.sleep(step / rate)
+                if follow and self.done_event is not None:
+                    break
+                # let the client writers run between blocks
+                await asyncio.sleep(0)
+            self.feed(tail)     # may be a truncated last line, feed() skips it
+        finally:
+            if f is not sys.stdin.buffer:
+                f.close()
+            self.finish()
+
+    async def _keyframes(self):
+        loop = asyncio.get_running_loop()
+        last = float("-inf")
+        encoded_at = -1             # n_events of `fut`
+        fut = None
+        while True:
+            await self._want_keyframe.wait()
+            if encoded_at != self.n_events:
+                # the state moved on: rate-limit new snapshots server-wide
+                wait = last + self.resync_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._want_keyframe.clear()
+            waiting = [c for c in self.clients if c.resync]
+            if not waiting:
+                continue
+
+            # snapshot and every waiting queue reset in the same producer step
+            if encoded_at != self.n_events:
+                fut = loop.run_in_executor(None, encode_keyframe, self.state.snapshot(), self.done_event)
+                encoded_at = self.n_events
+                self.keyframes += 1
+            for c in waiting:
+                c.resync = False
+                c.clear()
+                c.queue.put_nowait(fut)
+                if self.finished:
+                    c.queue.put_nowait(None)
+
+            # one encoding at a time; failures surface in the client writers
+            await asyncio.wait([fut])
+            last = loop.time()
+
+    # ---------------------------
+    # client side
+    # ---------------------------
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self._keyframe_task is None:
+            self._keyframe_task = asyncio.create_task(self._keyframes())
+        c = _Client(writer, self.queue_size)
+        self.clients.add(c)
+        self._want_keyframe.set()
+        try:
+            end = False
+            while not end:
+                items = [await c.queue.get()]
+                while not c.queue.empty():
+                    items.append(c.queue.get_nowait())
+                chunks = []
+                for item in items:
+                    if isinstance(item, bytes):
+                        chunks.append(item)
+                        continue
+                    if chunks:
+                        writer.write(b"".join(chunks))
+                        chunks = []
+                    if item is None:
+                        end = True
+                        break
+                    # keyframe, shielded: a client going away must not cancel the shared encoding
+                    writer.write(await asyncio.shield(item))
+                if chunks:
+                    writer.write(b"".join(chunks))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(c)
+            writer.close()
+
+
+async def serve(path: str, *, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix: str = "", maze: str = "", follow: bool = False, rate: float = 0.0,
+                queue_size: int = 4096, resync_interval: float = 1.0):
+    b = TraceBroadcaster(queue_size=queue_size, resync_interval=resync_interval)
+    if maze:
+        b.state.load_maze_txt(maze)
+
+    if unix:
+        server = await asyncio.start_unix_server(b.handle_client, path=unix)
+        where = f"unix:{unix}"
+    else:
+        server = await asyncio.start_server(b.handle_client, host=host, port=port)
+        where = f"tcp://{host}:{port}"
+    print(f"Serving {path} on {where}", flush=True)
+
+    async with server:
+        await b.pump(path, follow=follow, rate=rate)
+        print(f"Source finished ({b.n_events} events), still serving keyframes on {where}", flush=True)
+        await server.serve_forever()
@@ -0,0 +1,163 @@
+"""
+Cross-trace comparison: per-cell first-visit time / visit count, and the
+difference map between two traces of the same maze.
+
+Traces are scanned in binary chunks with a regex for the fixed-layout
+`visited_add` lines (cpp/*.cpp, trace_gen.py) and json only for the rare
+`visited_batch` lines, straight into numpy arrays, so a trace with millions
+of events is never held as dicts.
+
+"Time" is the visit ordinal: the k-th cell expansion of that trace (cells of
+a visited_batch are numbered in listed order). It does not depend on how
+many other events (relax, frontier_add, ...) an algorithm writes.
+
+Needs numpy (only imported when this module is used).
+"""
+import json
+import re
+from typing import Dict, List
+
+import numpy as np
+
+_CHUNK = 8 << 20
+
+_META_RE = re.compile(rb'^[^\n]*"op":\s*"meta"[^\n]*$', re.M)
+# fixed key order written by emit_event() / TraceWriter.emit()
+_VISIT_RE = re.compile(rb'"t":(\d+),"op":"visited_add","x":(\d+),"y":(\d+)')
+_VISIT_OP_RE = re.compile(rb'"op":\s*"visited_add"')
+_BATCH_RE = re.compile(rb'^[^\n]*"op":\s*"visited_batch"[^\n]*$', re.M)
+
+
+class VisitMap:
+    """
+    first[k] : visit ordinal of cell k = x * m + y (-1 = never visited)
+    count[k] : how many visit events hit cell k (DFS revisits cells)
+    """
+    def __init__(self, n: int, m: int, first, count, total: int):
+        self.n = n
+        self.m = m
+        self.first = first
+        self.count = count
+        self.total = total
+
+    @property
+    def seen(self):
+        return self.first >= 0
+
+
+def _lines_slow(chunk: bytes, t_parts, x_parts, y_parts, s_parts):
+    # any layout the fast regex does not cover (e.g. re-serialized by json.dumps)
+    for line in chunk.splitlines():
+        if not _VISIT_OP_RE.search(line):
+            continue
+        ev = json.loads(line)
+        t_parts.append(np.array([ev.get("t", 0)], dtype=np.int64))
+        x_parts.append(np.array([ev["x"]], dtype=np.int64))
+        y_parts.append(np.array([ev["y"]], dtype=np.int64))
+        s_parts.append(np.zeros(1, dtype=np.int64))
+
+
+def scan_visits(path: str) -> VisitMap:
+    """Read one trace and build its VisitMap."""
+    n = m = None
+    t_parts, x_parts, y_parts, s_parts = [], [], [], []
+
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(_CHUNK)
+            if not block and not tail:
+                break
+            buf = tail + block
+            if block:
+                cut = buf.rfind(b"\n") + 1
+                chunk, tail = buf[:cut], buf[cut:]
+            else:
+                chunk, tail = buf, b""
+
+            # plain substring checks first, the line-anchored regexes are slow
+            if n is None and b'"meta"' in chunk:
+                mt = _META_RE.search(chunk)
+                if mt:
+                    meta = json.loads(mt.group(0))
+                    n, m = int(meta["n"]), int(meta["m"])
+
+            hits = _VISIT_RE.findall(chunk)
+            if len(hits) == len(_VISIT_OP_RE.findall(chunk)):
+                if hits:
+                    arr = np.array(hits, dtype="S").astype(np.int64)
+                    t_parts.append(arr[:, 0])
+                    x_parts.append(arr[:, 1])
+                    y_parts.append(arr[:, 2])
+                    s_parts.append(np.zeros(len(arr), dtype=np.int64))
+            else:
+                _lines_slow(chunk, t_parts, x_parts, y_parts, s_parts)
+
+            batch_lines = _BATCH_RE.findall(chunk) if b'"visited_batch"' in chunk else ()
+            for line in batch_lines:
+                ev = json.loads(line)
+                cells = np.asarray(ev.get("cells", []), dtype=np.int64).reshape(-1, 2)
+                t_parts.append(np.full(len(cells), ev.get("t", 0), dtype=np.int64))
+                x_parts.append(cells[:, 0])
+                y_parts.append(cells[:, 1])
+                s_parts.append(np.arange(len(cells), dtype=np.int64))
+
+            if not block:
+                break
+
+    if n is None:
+        raise ValueError(f"No meta event in {path}")
+
+    if t_parts:
+        t = np.concatenate(t_parts)
+        sub = np.concatenate(s_parts)
+        cell = np.concatenate(x_parts) * m + np.concatenate(y_parts)
+    else:
+        t = sub = cell = np.zeros(0, dtype=np.int64)
+
+    # visit ordinal = position in (t, index inside batch) order
+    order = np.lexsort((sub, t))
+    cell = cell[order]
+    first = np.full(n * m, -1, dtype=np.int64)
+    uniq, first_pos = np.unique(cell, return_index=True)
+    first[uniq] = first_pos
+    count = np.bincount(cell, minlength=n * m).astype(np.int32)
+    return VisitMap(n, m, first, count, len(cell))
+
+
+def diff_maps(a: VisitMap, b: VisitMap):
+    """
+    Difference map a - b of first-visit ordinals (float, NaN where not both
+    visited; negative = a got there first) plus summary numbers.
+    """
+    if (a.n, a.m) != (b.n, b.m):
+        raise ValueError(f"Traces are for different grids: {a.n}x{a.m} vs {b.n}x{b.m}")
+
+    both = a.seen & b.seen
+    diff = np.full(a.n * a.m, np.nan)
+    diff[both] = a.first[both] - b.first[both]
+    d = diff[both]
+
+    summary = {
+        "cells_a": int(a.seen.sum()),
+        "cells_b": int(b.seen.sum()),
+        "both": int(both.sum()),
+        "only_a": int((a.seen & ~b.seen).sum()),
+        "only_b": int((b.seen & ~a.seen).sum()),
+        "a_first": int((d < 0).sum()),
+        "b_first": int((d > 0).sum()),
+        "mean_diff": float(d.mean()) if len(d) else 0.0,
+        "visits_a": a.total,
+        "visits_b": b.total,
+    }
+    return diff.reshape(a.n, a.m), summary
+
+
+def compare_traces(paths: List[str]) -> List[Dict]:
+    """Scan every trace once and diff each one against paths[0]."""
+    maps = [scan_visits(p) for p in paths]
+    out = []
+    for p, vm in zip(paths[1:], maps[1:]):
+        diff, summary = diff_maps(vm, maps[0])
+        out.append({"path": p, "diff": diff, "summary": summary, "visits": vm})
+    return out
@@ -0,0 +1,45 @@
+"""
+Maze txt loader (same format as data/ScannedMaze.txt and cpp readMazeFromFile).
+"""
+import re
+
+
+def load_walls_from_txt(path: str):
+    """
+    Read a maze txt ("n m" header, then n rows; 1 = wall, 4 = start, 3 = end).
+    Returns (n, m, walls, start, end), start/end are None if the file has no 4/3.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw_lines = [ln.strip() for ln in f if ln.strip()]
+
+    if not raw_lines:
+        raise ValueError(f"Empty maze file: {path}")
+
+    # 读第一行 n m
+    header = [int(x) for x in re.findall(r"-?\d+", raw_lines[0])]
+    if len(header) < 2:
+        raise ValueError(f"First line must contain n m, got: {raw_lines[0]!r}")
+    n, m = header[0], header[1]
+
+    if len(raw_lines) < 1 + n:
+        raise ValueError(f"Expected {n} rows after header, but got {len(raw_lines)-1}")
+
+    walls = set()
+    start = None
+    end = None
+
+    for x in range(n):
+        nums = [int(x) for x in re.findall(r"-?\d+", raw_lines[1 + x])]
+        if len(nums) != m:
+            raise ValueError(f"Row {x} length {len(nums)} != {m}. Line={raw_lines[1+x]!r}")
+
+        for y, v in enumerate(nums):
+            if v == 1:
+                walls.add((x, y))
+            elif v == 4:
+                start = (x, y)
+            elif v == 3:
+                end = (x, y)
+            # 0 以及其他值默认当空地
+
+    return n, m, walls, start, end
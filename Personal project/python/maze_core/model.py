@@ -0,0 +1,73 @@
+"""
+Headless maze state, shared by the GUI, the trace tools and the benchmarks.
+"""
+from typing import Optional, Tuple
+
+
+class MazeModel:
+    """
+    In-memory maze state (drawn by GUI_Animation.FrameRenderer).
+    No file I/O here.
+    """
+    def __init__(self):
+        self.n = 10
+        self.m = 10
+        self.start = (0, 0)
+        self.end = (9, 9)
+
+        # wall set: {(x, y), ...}
+        self.walls = set()
+
+        # rendering states
+        self.frontier = set()
+        self.visited = set()
+        self.current: Optional[Tuple[int, int]] = None
+
+        self.step = 0
+        self.last_op = "-"
+        self.message = "Ready"
+        
+        self.cur_path = []   # list[(x,y)]
+        self.cur_path_set = set()
+        
+        self.parent = {}            # (x,y) -> (px,py)
+        self.best_path = []         # list[(x,y)]
+        self.best_path_set = set()
+
+        # cells touched since the last rendered frame (see GUI_Animation.FrameRenderer)
+        self.dirty = set()
+        self.dirty_all = True
+
+    def reset_states(self):
+        # reset rendering/search state
+        self.frontier = set()
+        self.visited = set()
+        self.current = None
+
+        # reset path reconstruction state (clears orange path too)
+        self.parent = {}
+        self.best_path = []
+        self.best_path_set = set()
+
+        # reset DFS live-stack path (if used)
+        self.cur_path = []
+        self.cur_path_set = set()
+
+        self.step = 0
+        self.last_op = "-"
+        self.message = "Reset"
+        self.dirty_all = True
+    def apply_meta(self, n: int, m: int, sx: int, sy: int, ex: int, ey: int):
+        self.n, self.m = n, m
+        self.start = (sx, sy)
+        self.end = (ex, ey)
+        #self.walls.clear()
+        self.reset_states()
+        self.message = f"Meta loaded: {n}x{m}, start={self.start}, end={self.end}"
+
+    def set_wall(self, x: int, y: int, is_wall: bool = True):
+        if is_wall:
+            self.walls.add((x, y))
+        else:
+            self.walls.discard((x, y))
+        self.dirty.add((x, y))
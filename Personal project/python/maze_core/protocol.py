@@ -0,0 +1,406 @@
+"""
+JSONL event protocol decoder (ops emitted by cpp/*.cpp, trace_gen.py, batch_trace.py,
+and broadcast keyframes).
+"""
+import json
+import queue
+import threading
+from typing import Dict, Iterator
+
+from .maze_io import load_walls_from_txt
+from .model import MazeModel
+
+
+# events read ahead of consume_events() on a live stream; when it is full the
+# reader stops reading, so the server sees a slow client and resyncs it
+STREAM_BUFFER = 1024
+
+
+def is_stream_url(path: str) -> bool:
+    """True for broadcast server addresses (see broadcast.py) instead of trace files."""
+    return path.startswith(("tcp://", "unix:"))
+
+
+def iter_events(path: str) -> Iterator[Dict]:
+    """Yield one dict per non-empty line, raises ValueError on bad JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        for ln, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON decode error at line {ln}: {e}\nLine={line[:200]}") from e
+
+
+class EventPlayer:
+    """
+    Owns a MazeModel plus the loaded event list and applies events to it.
+    No Qt here: GUI_Animation.PaneWorker drives it from a worker thread,
+    headless tools call consume_events() directly.
+    """
+    def __init__(self):
+        self.model = MazeModel()
+        self.events = []
+        self.event_idx = 0
+        self.finished = False   # set on `done` / end of stream, PlayerPane stops its timer
+        # broadcast server being followed (attach_stream)
+        self.stream_url = ""
+        self._stream = None     # bounded queue.Queue filled by the reader thread
+        self._stream_stop = None
+
+    def reset(self):
+        if self.stream_url:
+            # the tail alone cannot rebuild the state, start over from a keyframe
+            self.attach_stream(self.stream_url)
+            return
+        self.model.reset_states()
+        self.event_idx = 0
+        self.finished = False
+        self.model.message = "Reset (no file loaded)"
+
+    def consume_events(self, batch: int = 1):
+        """
+        Apply up to `batch` events from self.events.
+        If no events are loaded, we just do nothing.
+        """
+        if self.stream_url:
+            if not self.finished:
+                self._consume_stream(batch)
+            return
+
+        if not self.events:
+            self.model.message = "No events loaded yet"
+            return
+
+        for _ in range(batch):
+            if self.event_idx >= len(self.events):
+                self.finished = True
+                self.model.last_op = "EOF"
+                self.model.message = "Reached end of event stream"
+                break
+
+            ev = self.events[self.event_idx]
+            self.event_idx += 1
+            self.apply_event(ev)
+            if self.finished:
+                break
+
+    def apply_event(self, ev: Dict):
+        """
+        Event protocol hook.
+        Expected keys based on your design:
+        - op: meta / set_current / visited_add / frontier_add / found / done
+              (+ frontier_batch / visited_batch, one event per BFS layer)
+        - t, x, y, dist, (and meta fields: n, m, sx, sy, ex, ey)
+        """
+        op = ev.get("op", "")
+        self.model.last_op = op
+        self.model.step = ev.get("t", self.model.step)
+
+        if op == "meta":
+            self.model.apply_meta(
+                ev.get("n", self.model.n),
+                ev.get("m", self.model.m),
+                ev.get("sx", self.model.start[0]),
+                ev.get("sy", self.model.start[1]),
+                ev.get("ex", self.model.end[0]),
+                ev.get("ey", self.model.end[1]),
+            )
+            
+        if op == "done":
+            self.finished = True
+            self.model.message = "Done"
+            # python trace generators (trace_gen.py) also report search effort
+            if "expanded" in ev:
+                self.model.message = f"Done, expanded={ev['expanded']}, events={ev.get('events', ev.get('t'))}"
+            return
+
+        # DFS: explicit best-path stream
+        if op == "best_clear":
+            self.model.best_path = []
+            self.model.best_path_set = set()
+            self.model.message = "Best path cleared"
+            return
+
+        # layer-batched ops (batch_trace.py):
+        # {"op":"frontier_batch","dist":d,"cells":[[x,y],...],"parents":[[px,py],...]}
+        # {"op":"visited_batch","dist":d,"cells":[[x,y],...],("parents":[[px,py],...])}
+        if op == "frontier_batch":
+            cells = [(int(c[0]), int(c[1])) for c in ev.get("cells", [])]
+            self.model.frontier.update(cells)
+            self.model.dirty.update(cells)
+            for pos, par in zip(cells, ev.get("parents", [])):
+                if par[0] >= 0 and par[1] >= 0:
+                    self.model.parent[pos] = (int(par[0]), int(par[1]))
+            self.model.message = f"Frontier batch: {len(cells)} (dist {ev.get('dist', '-')})"
+            return
+
+        if op == "visited_batch":
+            cells = [(int(c[0]), int(c[1])) for c in ev.get("cells", [])]
+            # parents are optional here (broadcast keyframes send them)
+            for pos, par in zip(cells, ev.get("parents", [])):
+                if par[0] >= 0 and par[1] >= 0:
+                    self.model.parent[pos] = (int(par[0]), int(par[1]))
+            self.model.visited.update(cells)
+            self.model.frontier.difference_update(cells)
+            self.model.dirty.update(cells)
+            if cells:
+                # last cell of the layer plays the role of set_current
+                self.model.current = cells[-1]
+                if self.model.parent:
+                    self.rebuild_best_path(cells[-1])
+            self.model.message = f"Visited batch: {len(cells)} (dist {ev.get('dist', '-')})"
+            return
+            
+        # broadcast resync marker, the batch ops that follow rebuild the state
+        if op == "keyframe":
+            self.model.message = "Keyframe"
+            return
+
+        # cell-list ops carry no x/y
+        if op == "walls":
+            # 支持一次性传一堆墙： {"op":"walls","cells":[[x,y],...]}
+            cells = ev.get("cells", [])
+            cnt = 0
+            for c in cells:
+                if isinstance(c, (list, tuple)) and len(c) >= 2:
+                    self.model.walls.add((int(c[0]), int(c[1])))
+                    cnt += 1
+                elif isinstance(c, dict) and "x" in c and "y" in c:
+                    self.model.walls.add((int(c["x"]), int(c["y"])))
+                    cnt += 1
+            self.model.dirty_all = True
+            self.model.message = f"Walls loaded: {cnt}"
+            return
+
+        if op == "path":
+            # 最终路径： {"op":"path","cells":[[x,y],...]}
+            # 这里先把 path 画成 visited（简单 MVP）。你也可以单独加一个 self.model.path 来上色。
+            cells = ev.get("cells", [])
+            for c in cells:
+                if isinstance(c, (list, tuple)) and len(c) >= 2:
+                    self.model.visited.add((int(c[0]), int(c[1])))
+            self.model.dirty_all = True
+            self.model.message = f"Path cells: {len(cells)}"
+            return
+
+        x = ev.get("x",None)
+        y = ev.get("y",None)
+        if x is None or y is None:
+            return
+            
+        pos = (x, y)
+        self.model.dirty.add(pos)
+        px = ev.get("px", None)
+        py = ev.get("py", None)
+        if px is not None and py is not None and px >= 0 and py >= 0:
+            self.model.parent[pos] = (px, py)
+
+        if op == "best_add":
+            # DFS best-path stream
+            self.model.best_path.append(pos)
+            self.model.best_path_set.add(pos)
+            self.model.message = f"Best path add {pos}"
+            return
+            
+        if op in ("frontier_add", "relax"):
+            # A*: relax == (re)insert/update in open-set; show it as frontier
+            self.model.frontier.add(pos)
+            px = ev.get("px"); py = ev.get("py")
+            if px is not None and py is not None and px >= 0 and py >= 0:
+                self.model.parent[pos] = (px, py)
+        
+        elif op == "set_current":
+            self.model.current = (x, y)
+            # popped from frontier
+            self.model.frontier.discard(pos)
+            # BFS/A*: reconstruct best path from parent chain
+            # (DFS uses best_clear/best_add; its parent map is empty.)
+            if self.model.parent:
+                self.rebuild_best_path(pos)
+            self.model.message = f"Current = {(x, y)}"
+                
+        elif op == "path_push":
+            self.model.cur_path.append(pos)
+            self.model.cur_path_set.add(pos)
+
+        elif op == "path_pop":
+            # 理论上 pop 的就是栈顶；保险起见按 pos 移除也行
+            if self.model.cur_path and self.model.cur_path[-1] == pos:
+                self.model.cur_path.pop()
+                self.model.cur_path_set.discard(pos)
+            else:
+                # fallback：乱序也能删
+                if pos in self.model.cur_path_set:
+                    self.model.cur_path_set.remove(pos)
+                    self.model.cur_path = [p for p in self.model.cur_path if p != pos]
+
+        elif op == "best_add":
+            # DFS best path cell
+            self.model.best_path.append(pos)
+            self.model.best_path_set.add(pos)
+            self.model.message = f"Best add {pos}"
+        
+
+        elif op == "visited_add":
+            self.model.visited.add((x, y))
+            self.model.frontier.discard((x, y))
+            self.model.message = f"Visited add {(x, y)}"
+
+        elif op == "frontier_add":
+            self.model.frontier.add((x, y))
+            self.model.message = f"Frontier add {(x, y)}"
+                
+        elif op in ("wall", "set_wall"):
+            is_wall = ev.get("is_wall", True)
+            if is_wall:
+                self.model.walls.add((x, y))
+            else:
+                self.model.walls.discard((x, y))
+            self.model.message = f"Wall {'add' if is_wall else 'remove'} {(x, y)}"
+
+        elif op in ("frontier_remove", "frontier_pop"):
+            self.model.frontier.discard((x, y))
+            self.model.message = f"Frontier remove {(x, y)}"
+
+        elif op == "found":
+            self.model.current = (x, y) if x is not None and y is not None else self.model.current
+            # Ensure final shortest path is shown for BFS/A*
+            if self.model.parent:
+                self.rebuild_best_path(pos)
+            self.model.message = "Found end!"
+
+    def rebuild_best_path(self, end_pos):
+        start = self.model.start
+        parent = self.model.parent
+
+        path = []
+        cur = end_pos
+        seen = set()  # 防止 parent 链出环导致死循环
+
+        while cur is not None and cur not in seen:
+            seen.add(cur)
+            path.append(cur)
+            if cur == start:
+                break
+            cur = parent.get(cur, None)
+
+        if not path or path[-1] != start:
+            # 说明 parent 链还不完整（比如 current 还没被 parent 记录）
+            self.model.best_path = []
+            self.model.best_path_set = set()
+            return
+
+        path.reverse()
+        self.model.best_path = path
+        self.model.best_path_set = set(path)
+
+
+    def load_maze_txt(self, maze_path: str):
+        n, m, walls, s, e = load_walls_from_txt(maze_path)
+
+        self.model.walls = walls
+        self.model.dirty_all = True
+
+        # 如果 txt 里有 4/3，就用它覆盖（这样绿/红格就和 txt 一致）
+        if s is not None:
+            self.model.start = s
+        if e is not None:
+            self.model.end = e
+
+    def load_events_from_jsonl(self, path: str):
+        # raises on bad files, PaneWorker turns that into a message box
+        events = list(iter_events(path))
+        self.detach_stream()
+        self.events = events
+        self.event_idx = 0
+        self.finished = False
+
+        # 清空当前状态
+        self.model.reset_states()
+        #self.model.walls.clear()
+
+        # 预处理：把 meta + 墙体类事件先应用掉，这样一加载就能看到正确迷宫
+        while self.event_idx < len(self.events):
+            op = self.events[self.event_idx].get("op", "")
+            if op in ("meta", "wall", "set_wall", "walls"):
+                self.apply_event(self.events[self.event_idx])
+                self.event_idx += 1
+                continue
+            break
+
+        self.model.message = f"Loaded {len(self.events)} events from {path}"
+
+    def _consume_stream(self, batch: int):
+        for _ in range(batch):
+            try:
+                item = self._stream.get_nowait()
+            except queue.Empty:
+                self.model.message = "Waiting for stream..."
+                return
+            if item is None or isinstance(item, Exception):
+                self.finished = True
+                self.model.last_op = "EOF"
+                self.model.message = "Stream closed" if item is None else f"Stream error: {item}"
+            else:
+                self.apply_event(item)
+            if self.finished:
+                self.detach_stream(keep_url=True)
+                return
+
+    def attach_stream(self, url: str):
+        """
+        Follow a maze_core.broadcast server ("tcp://host:port" or "unix:/path").
+        A reader thread fills a bounded buffer (STREAM_BUFFER) that
+        consume_events() drains; the server starts with a keyframe, so no
+        preamble here. Events are not kept, reset() re-attaches.
+        """
+        from .broadcast import iter_remote_events
+
+        self.detach_stream()
+        self.model.reset_states()
+        self.events = []
+        self.event_idx = 0
+        self.finished = False
+        self.stream_url = url
+        buf = self._stream = queue.Queue(maxsize=STREAM_BUFFER)
+        stop = self._stream_stop = threading.Event()
+
+        def put(item) -> bool:
+            # blocks while the viewer is behind (TCP backpressure), gives up on detach
+            while not stop.is_set():
+                try:
+                    buf.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def pump():
+            events = iter_remote_events(url)
+            try:
+                for ev in events:
+                    if not put(ev):
+                        return
+                put(None)
+            except (OSError, ValueError) as e:
+                put(e)
+            finally:
+                events.close()
+
+        threading.Thread(target=pump, name=f"stream {url}", daemon=True).start()
+        self.model.message = f"Attached to {url}"
+
+    def detach_stream(self, keep_url: bool = False):
+        """Stop the reader thread of attach_stream (its socket closes with it)."""
+        if self._stream_stop is not None:
+            self._stream_stop.set()
+        self._stream = None
+        self._stream_stop = None
+        if not keep_url:
+            self.stream_url = ""
+
+    load_walls_from_txt = staticmethod(load_walls_from_txt)
+
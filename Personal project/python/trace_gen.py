@@ -0,0 +1,401 @@
+"""
+Python trace generators (same JSONL event protocol as cpp/*.cpp).
+
+  bfs    : plain BFS, same event order as cpp/BFS.cpp (baseline for big grids,
+           the C++ solver is capped at MAXN=100)
+  jps    : Jump Point Search (4-connected) on top of A* with Manhattan h
+  bibfs  : bidirectional BFS, expands the smaller side one full layer at a time
+
+Every trace ends with a `done` event that also carries
+  expanded : number of cells popped / expanded
+  events   : number of events written (including `done`)
+
+Usage:
+  python trace_gen.py --maze ../data/ScannedMaze.txt --algo jps --out ../out
+  python trace_gen.py --random 1000x1000 --density 0.2 --seed 2 \
+      --write-maze ../out/big_maze.txt --algo bfs --algo jps --algo bibfs --out ../out
+
+Random grids are not checked for connectivity (seed 2 above has a path of
+length 1998, seed 1 does not), a `len=-1` trace means the end is unreachable.
+
+Then view with:
+  python GUI_Animation.py --maze ../out/big_maze.txt \
+      --pane "BFS:../out/bfs_py_events.jsonl" --pane "JPS:../out/jps_events.jsonl"
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from maze_core import load_walls_from_txt
+
+# same order as dx4/dy4 in cpp/maze_state.cpp
+DX4 = (1, 0, -1, 0)
+DY4 = (0, 1, 0, -1)
+
+
+# ---------------------------
+# Grid
+# ---------------------------
+class Grid:
+    """
+    Flat walkable mask: cell (x, y) -> open[x * m + y] (1 = walkable).
+    """
+    def __init__(self, n: int, m: int, open_cells: bytearray,
+                 start: Tuple[int, int], end: Tuple[int, int]):
+        self.n = n
+        self.m = m
+        self.open = open_cells
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_txt(cls, path: str) -> "Grid":
+        n, m, walls, start, end = load_walls_from_txt(path)
+        if start is None or end is None:
+            raise ValueError(f"Maze needs a start (4) and an end (3): {path}")
+        open_cells = bytearray(b"\x01") * (n * m)
+        for x, y in walls:
+            open_cells[x * m + y] = 0
+        return cls(n, m, open_cells, start, end)
+
+    @classmethod
+    def random(cls, n: int, m: int, density: float, seed: Optional[int] = None) -> "Grid":
+        # mostly open grid, start top-left, end bottom-right
+        rng = random.Random(seed)
+        open_cells = bytearray(1 if rng.random() >= density else 0 for _ in range(n * m))
+        start, end = (0, 0), (n - 1, m - 1)
+        open_cells[0] = 1
+        open_cells[n * m - 1] = 1
+        return cls(n, m, open_cells, start, end)
+
+    def write_txt(self, path: str):
+        sx, sy = self.start
+        ex, ey = self.end
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{self.n} {self.m}\n")
+            for x in range(self.n):
+                row = ["0" if self.open[x * self.m + y] else "1" for y in range(self.m)]
+                if x == sx:
+                    row[sy] = "4"
+                if x == ex:
+                    row[ey] = "3"
+                f.write(" ".join(row) + "\n")
+
+
+# ---------------------------
+# Event writer (byte-compatible with emit_event in cpp/*.cpp)
+# ---------------------------
+class TraceWriter:
+    def __init__(self, out):
+        self.out = out
+        self.tick = 0
+
+    def meta(self, g: Grid):
+        self.tick += 1
+        self.out.write(
+            f'{{"t":{self.tick},"op":"meta","n":{g.n},"m":{g.m},'
+            f'"sx":{g.start[0]},"sy":{g.start[1]},"ex":{g.end[0]},"ey":{g.end[1]}}}\n'
+        )
+
+    def emit(self, op: str, x: int, y: int, dist: int, px: int = -1, py: int = -1):
+        self.tick += 1
+        self.out.write(
+            f'{{"t":{self.tick},"op":"{op}","x":{x},"y":{y},"dist":{dist},"px":{px},"py":{py}}}\n'
+        )
+
+    def best_path(self, path: List[Tuple[int, int]]):
+        # full cell-by-cell path, overrides the parent-chain path the GUI rebuilds
+        self.emit("best_clear", -1, -1, len(path) - 1)
+        for i, (x, y) in enumerate(path):
+            self.emit("best_add", x, y, i)
+
+    def done(self, dist: int, expanded: int):
+        self.tick += 1
+        self.out.write(
+            f'{{"t":{self.tick},"op":"done","x":-1,"y":-1,"dist":{dist},"px":-1,"py":-1,'
+            f'"expanded":{expanded},"events":{self.tick}}}\n'
+        )
+
+
+def _trace_back(parent: dict, cur: Tuple[int, int]) -> List[Tuple[int, int]]:
+    path = [cur]
+    while parent[cur] != cur:
+        cur = parent[cur]
+        path.append(cur)
+    return path
+
+
+# ---------------------------
+# BFS (reference, mirrors cpp/BFS.cpp)
+# ---------------------------
+def bfs(g: Grid, w: TraceWriter) -> Tuple[int, int]:
+    n, m, ok = g.n, g.m, g.open
+    sx, sy = g.start
+    ex, ey = g.end
+    seen = bytearray(n * m)
+    best, expanded = -1, 0
+
+    w.meta(g)
+    seen[sx * m + sy] = 1
+    q = deque([(sx, sy, 0)])
+    w.emit("frontier_add", sx, sy, 0, sx, sy)
+
+    while q:
+        x, y, step = q.popleft()
+        expanded += 1
+        w.emit("set_current", x, y, step)
+        w.emit("visited_add", x, y, step)
+        if x == ex and y == ey:
+            best = step
+            w.emit("found", x, y, step)
+            break
+        for i in range(4):
+            nx, ny = x + DX4[i], y + DY4[i]
+            if not (0 <= nx < n and 0 <= ny < m):
+                continue
+            k = nx * m + ny
+            if not ok[k] or seen[k]:
+                continue
+            seen[k] = 1
+            q.append((nx, ny, step + 1))
+            w.emit("frontier_add", nx, ny, step + 1, x, y)
+
+    w.done(best, expanded)
+    return best, expanded
+
+
+# ---------------------------
+# Jump Point Search (4-connected)
+# ---------------------------
+def _jump(pm: bytearray, w: int, k: int, s: int, end_k: int) -> Optional[int]:
+    """
+    Walk from padded index k with stride s (+-1 = along y, +-w = along x)
+    until a jump point, or None when blocked. Moves along y only stop on
+    forced neighbours; moves along x also stop wherever a y-scan to either
+    side finds a jump point.
+    Iterative on purpose: straight runs on a 1000+ grid overflow the recursion limit.
+    """
+    while True:
+        k += s
+        if not pm[k]:
+            return None
+        if k == end_k:
+            return k
+        if s == 1 or s == -1:
+            if (pm[k - w] and not pm[k - w - s]) or (pm[k + w] and not pm[k + w - s]):
+                return k
+        else:
+            if (pm[k - 1] and not pm[k - 1 - s]) or (pm[k + 1] and not pm[k + 1 - s]):
+                return k
+            if _jump(pm, w, k, 1, end_k) is not None or _jump(pm, w, k, -1, end_k) is not None:
+                return k
+
+
+def _jps_strides(pm: bytearray, w: int, k: int, par: int) -> List[int]:
+    if par == k:
+        cand = (w, 1, -w, -1)
+    elif abs(k - par) < w:
+        # moving along y: keep going straight, or turn to either side
+        s = 1 if k > par else -1
+        cand = (-w, w, s)
+    else:
+        s = w if k > par else -w
+        cand = (-1, 1, s)
+    return [s for s in cand if pm[k + s]]
+
+
+def _expand_segments(jump_path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    # jump points are joined by straight runs, fill them back in
+    path = [jump_path[0]]
+    for (ax, ay), (bx, by) in zip(jump_path, jump_path[1:]):
+        dx = (bx > ax) - (bx < ax)
+        dy = (by > ay) - (by < ay)
+        x, y = ax, ay
+        while (x, y) != (bx, by):
+            x += dx
+            y += dy
+            path.append((x, y))
+    return path
+
+
+def jps(g: Grid, w: TraceWriter) -> Tuple[int, int]:
+    # work on a copy of the mask padded with a wall border, index k = (x+1)*W + (y+1),
+    # so the jump loops need no bounds checks
+    W = g.m + 2
+    pm = bytearray(W * (g.n + 2))
+    for x in range(g.n):
+        pm[(x + 1) * W + 1:(x + 1) * W + 1 + g.m] = g.open[x * g.m:(x + 1) * g.m]
+
+    def idx(p):
+        return (p[0] + 1) * W + p[1] + 1
+
+    def pos(k):
+        return (k // W - 1, k % W - 1)
+
+    ex, ey = g.end
+    start_k, end_k = idx(g.start), idx(g.end)
+
+    def h(k):
+        x, y = pos(k)
+        return abs(x - ex) + abs(y - ey)
+
+    gcost = {start_k: 0}
+    parent = {start_k: start_k}
+    closed = set()
+    expanded = 0
+
+    w.meta(g)
+    pq = [(h(start_k), 0, start_k)]
+    w.emit("frontier_add", g.start[0], g.start[1], 0, g.start[0], g.start[1])
+
+    while pq:
+        _, cg, k = heapq.heappop(pq)
+        if k in closed or cg != gcost[k]:
+            continue
+        closed.add(k)
+        expanded += 1
+        x, y = pos(k)
+        w.emit("set_current", x, y, cg)
+        w.emit("visited_add", x, y, cg)
+
+        if k == end_k:
+            w.emit("found", x, y, cg)
+            jump_path = [pos(j) for j in _trace_back(parent, k)[::-1]]
+            w.best_path(_expand_segments(jump_path))
+            w.done(cg, expanded)
+            return cg, expanded
+
+        for s in _jps_strides(pm, W, k, parent[k]):
+            jp = _jump(pm, W, k, s, end_k)
+            if jp is None or jp in closed:
+                continue
+            jx, jy = pos(jp)
+            ng = cg + abs(jx - x) + abs(jy - y)
+            if ng < gcost.get(jp, sys.maxsize):
+                gcost[jp] = ng
+                parent[jp] = k
+                heapq.heappush(pq, (ng + h(jp), ng, jp))
+                w.emit("frontier_add", jx, jy, ng, x, y)
+
+    w.done(-1, expanded)
+    return -1, expanded
+
+
+# ---------------------------
+# Bidirectional BFS
+# ---------------------------
+def bibfs(g: Grid, w: TraceWriter) -> Tuple[int, int]:
+    n, m, ok = g.n, g.m, g.open
+    start, end = g.start, g.end
+    expanded = 0
+
+    w.meta(g)
+    if start == end:
+        w.emit("found", start[0], start[1], 0)
+        w.done(0, 0)
+        return 0, 0
+
+    # side 0 grows from start, side 1 from end; parents point back to their own root
+    dist = ({start: 0}, {end: 0})
+    parent = ({start: start}, {end: end})
+    layer = ([start], [end])
+    w.emit("frontier_add", start[0], start[1], 0, start[0], start[1])
+    w.emit("frontier_add", end[0], end[1], 0, end[0], end[1])
+
+    while layer[0] and layer[1]:
+        side = 0 if len(layer[0]) <= len(layer[1]) else 1
+        mine, other = dist[side], dist[1 - side]
+        meet = None      # (length, from-cell, other-side cell)
+        nxt = []
+        # finish the whole layer before stopping, the first meeting is not always the shortest
+        for (x, y) in layer[side]:
+            d = mine[(x, y)]
+            expanded += 1
+            w.emit("set_current", x, y, d)
+            w.emit("visited_add", x, y, d)
+            for i in range(4):
+                nx, ny = x + DX4[i], y + DY4[i]
+                if not (0 <= nx < n and 0 <= ny < m) or not ok[nx * m + ny]:
+                    continue
+                pos = (nx, ny)
+                if pos in other:
+                    total = d + 1 + other[pos]
+                    if meet is None or total < meet[0]:
+                        meet = (total, (x, y), pos)
+                    continue
+                if pos in mine:
+                    continue
+                mine[pos] = d + 1
+                parent[side][pos] = (x, y)
+                nxt.append(pos)
+                w.emit("frontier_add", nx, ny, d + 1, x, y)
+
+        if meet is not None:
+            total, a, b = meet
+            w.emit("found", b[0], b[1], total)
+            half_a = _trace_back(parent[side], a)[::-1]
+            half_b = _trace_back(parent[1 - side], b)
+            path = half_a + half_b
+            if side == 1:
+                path.reverse()
+            w.best_path(path)
+            w.done(total, expanded)
+            return total, expanded
+
+        layer = (nxt, layer[1]) if side == 0 else (layer[0], nxt)
+
+    w.done(-1, expanded)
+    return -1, expanded
+
+
+ALGOS = {
+    # algo -> (generator, default output file name)
+    "bfs": (bfs, "bfs_py_events.jsonl"),
+    "jps": (jps, "jps_events.jsonl"),
+    "bibfs": (bibfs, "bibfs_events.jsonl"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write JSONL search traces for GUI_Animation.py")
+    parser.add_argument("--maze", type=str, default="", help="maze txt (same format as data/ScannedMaze.txt)")
+    parser.add_argument("--random", type=str, default="", help='random open grid instead of --maze, e.g. "1000x1000"')
+    parser.add_argument("--density", type=float, default=0.2, help="wall density for --random")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--write-maze", type=str, default="", help="save the (random) maze as txt for --maze in the GUI")
+    parser.add_argument("--algo", action="append", choices=sorted(ALGOS), default=[], help="repeatable")
+    parser.add_argument("--out", type=str, default="out", help="output directory")
+    args = parser.parse_args()
+
+    if args.random:
+        n, m = (int(v) for v in args.random.lower().split("x", 1))
+        grid = Grid.random(n, m, args.density, args.seed)
+    elif args.maze:
+        grid = Grid.from_txt(args.maze)
+    else:
+        parser.error("need --maze or --random")
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.write_maze:
+        os.makedirs(os.path.dirname(args.write_maze) or ".", exist_ok=True)
+        grid.write_txt(args.write_maze)
+
+    for algo in args.algo or sorted(ALGOS):
+        fn, name = ALGOS[algo]
+        path = os.path.join(args.out, name)
+        t0 = time.perf_counter()
+        with open(path, "w", encoding="utf-8") as f:
+            w = TraceWriter(f)
+            best, expanded = fn(grid, w)
+        dt = time.perf_counter() - t0
+        print(f"{algo:6s} len={best:<6d} expanded={expanded:<9d} events={w.tick:<9d} "
+              f"{dt:.2f}s -> {path}")
+
+
+if __name__ == "__main__":
+    main()